@@ -1,13 +1,18 @@
 from pydantic_settings import BaseSettings
+from functools import lru_cache
 from typing import Optional
 import os
 
+# Largest image accepted by /upload/image (also bounds the request body)
+MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+
 
 class Settings(BaseSettings):
     # Read directly from environment variables with fallback
     supabase_url: str = os.getenv("SUPABASE_URL", "")
     supabase_key: str = os.getenv("SUPABASE_KEY", "")
     supabase_service_key: str = os.getenv("SUPABASE_SERVICE_KEY", "")
+    supabase_jwt_secret: str = os.getenv("SUPABASE_JWT_SECRET", "")
     openai_api_key: Optional[str] = os.getenv("OPENAI_API_KEY")
     environment: str = os.getenv("ENVIRONMENT", "development")
     
@@ -20,39 +25,54 @@ class Settings(BaseSettings):
         env_file_encoding = 'utf-8'
 
 
-# Create settings instance
-# This will load from environment variables (Vercel) or .env file (local)
-try:
-    # Create settings - it will use os.getenv defaults if Pydantic doesn't find them
-    settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Load and validate settings on first use.
+    Loads from environment variables (Vercel) or .env file (local). Deferred
+    so that endpoints which never touch Supabase (e.g. /health) don't pay
+    for settings initialization on a cold start.
+    
+    Returns:
+        Validated settings instance
+        
+    Raises:
+        RuntimeError: If required environment variables are missing
+    """
+    try:
+        # Create settings - it will use os.getenv defaults if Pydantic doesn't find them
+        settings = Settings()
     
-    # Validate that required settings are not empty
-    if not settings.supabase_url or not settings.supabase_key or not settings.supabase_service_key:
-        missing = []
-        if not settings.supabase_url:
-            missing.append("SUPABASE_URL")
-        if not settings.supabase_key:
-            missing.append("SUPABASE_KEY")
-        if not settings.supabase_service_key:
-            missing.append("SUPABASE_SERVICE_KEY")
+        # Validate that required settings are not empty
+        # supabase_jwt_secret is only needed to verify tokens, so it is
+        # checked where it is used (get_current_user) instead of here
+        if not settings.supabase_url or not settings.supabase_key or not settings.supabase_service_key:
+            missing = []
+            if not settings.supabase_url:
+                missing.append("SUPABASE_URL")
+            if not settings.supabase_key:
+                missing.append("SUPABASE_KEY")
+            if not settings.supabase_service_key:
+                missing.append("SUPABASE_SERVICE_KEY")
         
-        error_msg = f"Missing environment variables: {', '.join(missing)}\n\n"
-        error_msg += "Please set these in Vercel:\n"
-        error_msg += "1. Go to: Vercel Dashboard → Your Project → Settings → Environment Variables\n"
-        error_msg += "2. Make sure they're set for 'Production' environment\n"
-        error_msg += "3. Redeploy after adding them (important!)\n"
-        error_msg += "\nAfter adding variables, you MUST redeploy for them to take effect!"
-        raise ValueError(error_msg)
+            error_msg = f"Missing environment variables: {', '.join(missing)}\n\n"
+            error_msg += "Please set these in Vercel:\n"
+            error_msg += "1. Go to: Vercel Dashboard → Your Project → Settings → Environment Variables\n"
+            error_msg += "2. Make sure they're set for 'Production' environment\n"
+            error_msg += "3. Redeploy after adding them (important!)\n"
+            error_msg += "\nAfter adding variables, you MUST redeploy for them to take effect!"
+            raise ValueError(error_msg)
         
-except Exception as e:
-    # If settings fail to load, provide helpful error message
-    error_msg = f"Error loading settings: {e}\n\n"
-    error_msg += "Make sure these environment variables are set in Vercel:\n"
-    error_msg += "  - SUPABASE_URL\n"
-    error_msg += "  - SUPABASE_KEY\n"
-    error_msg += "  - SUPABASE_SERVICE_KEY\n"
-    error_msg += "\nIMPORTANT: After adding variables, you MUST redeploy!"
+    except Exception as e:
+        # If settings fail to load, provide helpful error message
+        error_msg = f"Error loading settings: {e}\n\n"
+        error_msg += "Make sure these environment variables are set in Vercel:\n"
+        error_msg += "  - SUPABASE_URL\n"
+        error_msg += "  - SUPABASE_KEY\n"
+        error_msg += "  - SUPABASE_SERVICE_KEY\n"
+        error_msg += "\nIMPORTANT: After adding variables, you MUST redeploy!"
     
-    # In production, raise the error so it shows in logs
-    raise RuntimeError(error_msg) from e
-
+        # In production, raise the error so it shows in logs
+        raise RuntimeError(error_msg) from e
+    
+    return settings
@@ -1,17 +1,75 @@
-from supabase import create_client, Client
-from app.config import settings
+from app.config import get_settings
+from cachetools import LRUCache
+from fastapi import HTTPException
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable
+import hashlib
+import threading
 
-# Create Supabase client
-supabase: Client = create_client(settings.supabase_url, settings.supabase_key)
+# The supabase SDK is imported inside the client factories so that importing
+# the app (and serving /health) doesn't pay for it on a cold start
+if TYPE_CHECKING:
+    from supabase import Client
 
-# Create Supabase client with service key for admin operations
-supabase_admin: Client = create_client(settings.supabase_url, settings.supabase_service_key)
 
+@lru_cache(maxsize=1)
+def get_supabase() -> "Client":
+    """
+    Return the Supabase client using the anon key.
+    Created on first use so settings are only loaded when Supabase is needed.
+    """
+    from supabase import create_client
+    
+    settings = get_settings()
+    return create_client(settings.supabase_url, settings.supabase_key)
+
+
+@lru_cache(maxsize=1)
+def get_supabase_admin() -> "Client":
+    """
+    Return the Supabase client with service key for admin operations.
+    Created on first use so settings are only loaded when Supabase is needed.
+    """
+    from supabase import create_client
+    
+    settings = get_settings()
+    return create_client(settings.supabase_url, settings.supabase_service_key)
+
+
+def require_client(factory: Callable[[], "Client"]) -> "Client":
+    """
+    Get a Supabase client from a request handler.
+    Missing settings are a server misconfiguration: the details are logged
+    and the client only sees a generic 500, never the settings error.
+    
+    Args:
+        factory: get_supabase or get_supabase_admin
+        
+    Returns:
+        The Supabase client
+        
+    Raises:
+        HTTPException: 500 if settings could not be loaded
+    """
+    try:
+        return factory()
+    except RuntimeError as e:
+        print(f"Supabase unavailable: {e}")
+        raise HTTPException(status_code=500, detail="Server is not configured correctly")
 
-def get_user_supabase_client(user_token: str) -> Client:
+
+# Per-user clients keyed by sha256(token), sized to expected concurrency
+# Each client carries its user's Authorization header, so concurrent requests
+# never share (and overwrite) a header on one client
+_user_clients = LRUCache(maxsize=10)
+_user_clients_lock = threading.Lock()
+
+
+def get_user_supabase_client(user_token: str) -> "Client":
     """
-    Create a Supabase client with the user's JWT token.
+    Return a Supabase client authorized with the user's JWT token.
     This allows RLS policies to work correctly by setting auth.uid().
+    Clients are reused across requests made with the same token.
     
     Args:
         user_token: The user's JWT access token
@@ -19,10 +77,16 @@ def get_user_supabase_client(user_token: str) -> Client:
     Returns:
         Supabase client configured with the user's token
     """
-    # Use service role key but set the Authorization header with user's token
-    # This allows RLS to work while still having admin privileges
+    key = hashlib.sha256(user_token.encode()).digest()
+    with _user_clients_lock:
+        client = _user_clients.get(key)
+    if client is not None:
+        return client
+    
+    from supabase import create_client
     from supabase.client import ClientOptions
     
+    settings = get_settings()
     options = ClientOptions(
         headers={
             "Authorization": f"Bearer {user_token}",
@@ -32,5 +96,6 @@ def get_user_supabase_client(user_token: str) -> Client:
     
     # Use anon key but with user's token in headers for RLS
     client = create_client(settings.supabase_url, settings.supabase_key, options)
+    with _user_clients_lock:
+        _user_clients[key] = client
     return client
-
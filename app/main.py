@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes import auth, notes, upload
+from app.middleware.upload_limit import UploadSizeLimitMiddleware
 
 app = FastAPI(
     title="Notes App API",
@@ -11,20 +12,34 @@ app = FastAPI(
 # Configure CORS
 # Allow localhost for development and environment variable for production
 import os
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def _env() -> tuple[str | None, str | None, str | None]:
+    """Read the CORS-related environment variables once."""
+    return (os.getenv("FRONTEND_URL"), os.getenv("VERCEL_URL"), os.getenv("VERCEL"))
+
+
+frontend_url, vercel_url, on_vercel = _env()
 cors_origins = [
     "http://localhost:5173",
     "http://localhost:3000",
 ]
 # Add production frontend URL from environment variable if set
-if os.getenv("FRONTEND_URL"):
-    cors_origins.append(os.getenv("FRONTEND_URL"))
+if frontend_url:
+    cors_origins.append(frontend_url)
 # Add Vercel URLs automatically
-if os.getenv("VERCEL_URL"):
-    cors_origins.append(f"https://{os.getenv('VERCEL_URL')}")
+if vercel_url:
+    cors_origins.append(f"https://{vercel_url}")
 # In production on Vercel, allow all origins for simplicity
-if os.getenv("VERCEL"):
+if on_vercel:
     cors_origins = ["*"]  # Allow all in Vercel production
 
+# Cap upload body size while it is received (added before CORS so
+# rejections still carry CORS headers)
+app.add_middleware(UploadSizeLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=cors_origins,
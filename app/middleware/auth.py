@@ -1,13 +1,31 @@
 from fastapi import HTTPException, Security, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.database import supabase_admin
+from app.config import get_settings
+from cachetools import TTLCache
+from dataclasses import dataclass
+import hashlib
+import time
 import jwt
 
 
 security = HTTPBearer()
 
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(security)) -> dict:
+@dataclass(frozen=True, slots=True)
+class CurrentUser:
+    """Authenticated user resolved from the request's bearer token."""
+    id: str
+    email: str
+
+
+# Cache of verified tokens keyed by sha256(token) -> (CurrentUser, exp)
+# Clients reuse the same bearer token until it expires, so repeat requests
+# skip signature verification entirely. Entries live at most 300s and are
+# dropped as soon as the token's own exp passes
+_decode_cache = TTLCache(maxsize=10_000, ttl=300)
+
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(security)) -> CurrentUser:
     """
     Verify JWT token and return current user.
     
@@ -15,42 +33,56 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(
         credentials: HTTP Bearer token from request header
         
     Returns:
-        User dictionary with user information
+        CurrentUser with the user's id and email
         
     Raises:
         HTTPException: If token is invalid or user not found
     """
     token = credentials.credentials
+    key = hashlib.sha256(token.encode()).digest()
+    
+    # Serve from cache unless the token has expired since it was stored
+    cached = _decode_cache.get(key)
+    if cached is not None:
+        user, exp = cached
+        if exp > time.time():
+            return user
+        _decode_cache.pop(key, None)
+    
+    # Missing settings are a server misconfiguration, not a bad token
+    try:
+        jwt_secret = get_settings().supabase_jwt_secret
+        if not jwt_secret:
+            raise RuntimeError("Missing environment variable: SUPABASE_JWT_SECRET")
+    except RuntimeError as e:
+        print(f"Authentication unavailable: {e}")
+        raise HTTPException(status_code=500, detail="Authentication is not configured on the server")
     
     try:
-        # Decode JWT token to extract user info
+        # Verify the signature with the project's JWT secret and decode user info
         # Supabase JWT tokens contain user information in the payload
-        # We decode without verification since we trust Supabase-issued tokens
-        # In production with proper setup, you could verify the signature
-        decoded = jwt.decode(token, options={"verify_signature": False})
+        decoded = jwt.decode(
+            token,
+            jwt_secret,
+            algorithms=["HS256"],
+            audience="authenticated",
+            options={"require": ["exp", "sub"]}
+        )
         
         user_id = decoded.get("sub")
         email = decoded.get("email", "")
+        exp = decoded["exp"]
         
         if not user_id:
             raise HTTPException(status_code=401, detail="Invalid token: missing user ID")
         
-        # Optionally verify user exists in Supabase using admin client
-        try:
-            user_response = supabase_admin.auth.admin.get_user_by_id(user_id)
-            if user_response and user_response.user:
-                email = user_response.user.email or email
-        except Exception:
-            # If admin lookup fails, use email from token
-            pass
+        user = CurrentUser(id=user_id, email=email)
+        _decode_cache[key] = (user, exp)
         
-        return {
-            "id": user_id,
-            "email": email,
-            "token": token
-        }
+        return user
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token has expired")
     except jwt.DecodeError:
         raise HTTPException(status_code=401, detail="Invalid token format")
     except Exception as e:
         raise HTTPException(status_code=401, detail=f"Invalid authentication token: {str(e)}")
-
@@ -0,0 +1,60 @@
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from app.config import MAX_FILE_SIZE
+
+# Allowance for multipart boundaries and part headers around the file
+MULTIPART_OVERHEAD = 64 * 1024  # 64KB
+MAX_UPLOAD_REQUEST_SIZE = MAX_FILE_SIZE + MULTIPART_OVERHEAD
+
+UPLOAD_PATH_SUFFIX = "/upload/image"
+
+
+class UploadSizeLimitMiddleware:
+    """
+    ASGI middleware that caps the request body size of image uploads.
+    
+    FastAPI parses (and spools) the whole multipart body before upload_image
+    runs, so the limit has to be enforced while the body is being received:
+    requests declaring a larger Content-Length are rejected before any body
+    is read, and the body stream is counted so chunked uploads without a
+    Content-Length are cut off as soon as they exceed the limit. Other
+    routes are passed through untouched.
+    """
+
+    def __init__(self, app, max_body_size: int = MAX_UPLOAD_REQUEST_SIZE):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not scope["path"].endswith(UPLOAD_PATH_SUFFIX)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"File too large. Maximum size is {MAX_FILE_SIZE / (1024 * 1024)}MB"
+
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if value.isdigit() and int(value) > self.max_body_size:
+                    response = JSONResponse(status_code=413, content={"detail": detail})
+                    await response(scope, receive, send)
+                    return
+                break
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    # Raised while FastAPI reads the form; its exception
+                    # handling turns this into a 413 response
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -1,10 +1,14 @@
 from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import RedirectResponse
-from app.schemas import UserRegister, UserLogin, TokenResponse
-from app.database import supabase
+from fastapi.responses import JSONResponse, RedirectResponse
+from app.schemas import UserRegister, UserLogin, TokenResponse, UserInfo
+from app.database import get_supabase, require_client
+import re
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
+# Extracts the wait time from Supabase rate-limit messages
+_WAIT_RE = re.compile(r'(\d+)\s+seconds?')
+
 
 @router.post("/register", response_model=TokenResponse)
 async def register(user_data: UserRegister):
@@ -17,6 +21,7 @@ async def register(user_data: UserRegister):
     Returns:
         Access token and user information
     """
+    supabase = require_client(get_supabase)
     try:
         # Create user with Supabase Auth
         # Set redirect_to for email confirmation callback
@@ -38,7 +43,6 @@ async def register(user_data: UserRegister):
         if not session:
             # User created successfully, but email confirmation is required
             # This happens when "Enable email confirmations" is ON in Supabase
-            from fastapi.responses import JSONResponse
             return JSONResponse(
                 status_code=200,
                 content={
@@ -52,10 +56,11 @@ async def register(user_data: UserRegister):
         return TokenResponse(
             access_token=session.access_token,
             token_type="bearer",
-            user={
-                "id": response.user.id,
-                "email": response.user.email
-            }
+            user=UserInfo(
+                id=response.user.id,
+                email=response.user.email,
+                created_at=response.user.created_at
+            )
         )
     except Exception as e:
         error_message = str(e)
@@ -77,13 +82,13 @@ async def register(user_data: UserRegister):
                 if error_code == 'signup_disabled':
                     raise HTTPException(status_code=400, detail="User registration is disabled in Supabase settings.")
                 
-                if 'already registered' in error_msg.lower() or 'already exists' in error_msg.lower():
+                em = error_msg.lower()
+                if any(k in em for k in ('already registered', 'already exists')):
                     raise HTTPException(status_code=400, detail="An account with this email already exists. Please log in instead.")
                     
-                if 'rate limit' in error_msg.lower() or 'security purposes' in error_msg.lower():
+                if any(k in em for k in ('rate limit', 'security purposes')):
                     # Extract wait time if available
-                    import re
-                    wait_match = re.search(r'(\d+)\s+seconds?', error_msg)
+                    wait_match = _WAIT_RE.search(error_msg)
                     if wait_match:
                         wait_time = wait_match.group(1)
                         raise HTTPException(
@@ -98,11 +103,12 @@ async def register(user_data: UserRegister):
             except Exception:
                 pass  # Fall through to general error handling
         
+        em = error_message.lower()
+        
         # Handle rate limiting error with better message
-        if "security purposes" in error_message or "rate limit" in error_message.lower():
+        if "security purposes" in error_message or "rate limit" in em:
             # Extract wait time if available
-            import re
-            wait_match = re.search(r'(\d+)\s+seconds?', error_message)
+            wait_match = _WAIT_RE.search(error_message)
             if wait_match:
                 wait_time = wait_match.group(1)
                 raise HTTPException(
@@ -116,13 +122,13 @@ async def register(user_data: UserRegister):
                 )
         
         # Handle other common errors
-        if "already registered" in error_message.lower() or "already exists" in error_message.lower():
+        if any(k in em for k in ("already registered", "already exists")):
             raise HTTPException(status_code=400, detail="An account with this email already exists. Please log in instead.")
         
-        if "invalid email" in error_message.lower():
+        if "invalid email" in em:
             raise HTTPException(status_code=400, detail="Please enter a valid email address.")
         
-        if "password" in error_message.lower() and "weak" in error_message.lower():
+        if "password" in em and "weak" in em:
             raise HTTPException(status_code=400, detail="Password is too weak. Please use a stronger password (at least 6 characters).")
         
         raise HTTPException(status_code=400, detail=f"Registration failed: {error_message}")
@@ -139,6 +145,7 @@ async def login(user_data: UserLogin):
     Returns:
         Access token and user information
     """
+    supabase = require_client(get_supabase)
     try:
         # Authenticate with Supabase
         response = supabase.auth.sign_in_with_password({
@@ -152,10 +159,11 @@ async def login(user_data: UserLogin):
         return TokenResponse(
             access_token=response.session.access_token,
             token_type="bearer",
-            user={
-                "id": response.user.id,
-                "email": response.user.email
-            }
+            user=UserInfo(
+                id=response.user.id,
+                email=response.user.email,
+                created_at=response.user.created_at
+            )
         )
     except Exception as e:
         raise HTTPException(status_code=401, detail=f"Login failed: {str(e)}")
@@ -174,6 +182,7 @@ async def confirm_email(
     Note: Supabase email confirmation usually redirects directly to frontend.
     This endpoint can handle manual confirmation if needed.
     """
+    supabase = require_client(get_supabase)
     try:
         # For email confirmation, Supabase typically handles it client-side
         # If we have tokens, we can verify them
@@ -1,16 +1,21 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import Response, StreamingResponse
 from typing import List
-from app.schemas import NoteCreate, NoteUpdate, NoteResponse
-from app.database import supabase_admin
-from app.middleware.auth import get_current_user
-from app.services.ai_service import summarize_text
+from app.schemas import NoteCreate, NoteUpdate, NoteResponse, NOTE_LIST_ADAPTER
+from app.database import get_supabase_admin, require_client
+from app.middleware.auth import CurrentUser, get_current_user
+from app.services.ai_service import stream_summary, summarize_text
 from datetime import datetime
+import json
 
 router = APIRouter(prefix="/notes", tags=["notes"])
 
+# Columns exposed by NoteResponse
+NOTE_COLUMNS = "id,title,content,image_url,summary,user_id,created_at,updated_at"
+
 
 @router.post("", response_model=NoteResponse, status_code=201)
-async def create_note(note_data: NoteCreate, current_user: dict = Depends(get_current_user)):
+async def create_note(note_data: NoteCreate, current_user: CurrentUser = Depends(get_current_user)):
     """
     Create a new note.
     
@@ -21,9 +26,10 @@ async def create_note(note_data: NoteCreate, current_user: dict = Depends(get_cu
     Returns:
         Created note
     """
+    supabase = require_client(get_supabase_admin)
     try:
         # Generate summary using AI
-        summary = summarize_text(note_data.content)
+        summary = await summarize_text(note_data.content)
         
         # Insert note into Supabase
         # Using admin client since we've already validated the user in middleware
@@ -32,35 +38,21 @@ async def create_note(note_data: NoteCreate, current_user: dict = Depends(get_cu
             "content": note_data.content,
             "image_url": note_data.image_url,
             "summary": summary,
-            "user_id": current_user["id"],
-            "created_at": datetime.utcnow().isoformat(),
-            "updated_at": datetime.utcnow().isoformat()
+            "user_id": current_user.id
         }
         
-        response = supabase_admin.table("notes").insert(note_dict).execute()
+        response = supabase.table("notes").insert(note_dict).execute()
         
         if not response.data:
             raise HTTPException(status_code=400, detail="Failed to create note")
         
-        note = response.data[0]
-        
-        # Ensure id is an integer (BIGSERIAL might come as string)
-        if 'id' in note and note['id'] is not None:
-            note['id'] = int(note['id'])
-        
-        # Parse datetime strings if needed
-        if 'created_at' in note and isinstance(note['created_at'], str):
-            note['created_at'] = datetime.fromisoformat(note['created_at'].replace('Z', '+00:00'))
-        if 'updated_at' in note and isinstance(note['updated_at'], str):
-            note['updated_at'] = datetime.fromisoformat(note['updated_at'].replace('Z', '+00:00'))
-        
-        return NoteResponse(**note)
+        return NoteResponse.model_validate(response.data[0])
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to create note: {str(e)}")
 
 
 @router.get("", response_model=List[NoteResponse])
-async def get_notes(current_user: dict = Depends(get_current_user)):
+async def get_notes(current_user: CurrentUser = Depends(get_current_user)):
     """
     Get all notes for the current user.
     
@@ -70,51 +62,21 @@ async def get_notes(current_user: dict = Depends(get_current_user)):
     Returns:
         List of user's notes
     """
+    supabase = require_client(get_supabase_admin)
     try:
         # Using admin client since we've already validated the user in middleware
-        response = supabase_admin.table("notes").select("*").eq("user_id", current_user["id"]).order("created_at", desc=True).execute()
-        
-        # Convert data types for each note
-        notes = []
-        for note in response.data:
-            # Only convert id if it's actually a number (not a UUID)
-            if 'id' in note and note['id'] is not None:
-                try:
-                    # Check if it's a UUID (contains hyphens) - if so, skip conversion
-                    if isinstance(note['id'], str) and '-' in note['id']:
-                        # This shouldn't happen - id should be numeric
-                        print(f"Warning: id appears to be a UUID: {note['id']}, skipping conversion")
-                    elif isinstance(note['id'], str) and note['id'].isdigit():
-                        note['id'] = int(note['id'])
-                    elif isinstance(note['id'], (int, float)):
-                        note['id'] = int(note['id'])
-                except (ValueError, TypeError) as e:
-                    # If conversion fails, log the error
-                    print(f"Error converting id to int: {note.get('id')}, error: {e}")
-                    raise HTTPException(status_code=500, detail=f"Invalid note id format: {note.get('id')}")
-            
-            # Parse datetime strings
-            if 'created_at' in note and isinstance(note['created_at'], str):
-                try:
-                    note['created_at'] = datetime.fromisoformat(note['created_at'].replace('Z', '+00:00'))
-                except (ValueError, AttributeError):
-                    pass  # Keep as string if parsing fails
-            
-            if 'updated_at' in note and isinstance(note['updated_at'], str):
-                try:
-                    note['updated_at'] = datetime.fromisoformat(note['updated_at'].replace('Z', '+00:00'))
-                except (ValueError, AttributeError):
-                    pass  # Keep as string if parsing fails
-            
-            notes.append(NoteResponse(**note))
-        
-        return notes
+        response = supabase.table("notes").select(NOTE_COLUMNS).eq("user_id", current_user.id).order("created_at", desc=True).execute()
+        
+        # Validate and serialize the whole page in pydantic-core in one pass each,
+        # bypassing FastAPI's per-item response_model re-validation
+        notes = NOTE_LIST_ADAPTER.validate_python(response.data)
+        return Response(content=NOTE_LIST_ADAPTER.dump_json(notes), media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch notes: {str(e)}")
 
 
 @router.get("/{note_id}", response_model=NoteResponse)
-async def get_note(note_id: int, current_user: dict = Depends(get_current_user)):
+async def get_note(note_id: int, current_user: CurrentUser = Depends(get_current_user)):
     """
     Get a specific note by ID.
     
@@ -125,23 +87,15 @@ async def get_note(note_id: int, current_user: dict = Depends(get_current_user))
     Returns:
         Note details
     """
+    supabase = require_client(get_supabase_admin)
     try:
         # Using admin client since we've already validated the user in middleware
-        response = supabase_admin.table("notes").select("*").eq("id", note_id).eq("user_id", current_user["id"]).execute()
+        response = supabase.table("notes").select(NOTE_COLUMNS).eq("id", note_id).eq("user_id", current_user.id).execute()
         
         if not response.data:
             raise HTTPException(status_code=404, detail="Note not found")
         
-        note = response.data[0]
-        # Convert data types
-        if 'id' in note and note['id'] is not None:
-            note['id'] = int(note['id'])
-        if 'created_at' in note and isinstance(note['created_at'], str):
-            note['created_at'] = datetime.fromisoformat(note['created_at'].replace('Z', '+00:00'))
-        if 'updated_at' in note and isinstance(note['updated_at'], str):
-            note['updated_at'] = datetime.fromisoformat(note['updated_at'].replace('Z', '+00:00'))
-        
-        return NoteResponse(**note)
+        return NoteResponse.model_validate(response.data[0])
     except HTTPException:
         raise
     except Exception as e:
@@ -149,7 +103,7 @@ async def get_note(note_id: int, current_user: dict = Depends(get_current_user))
 
 
 @router.delete("/{note_id}", status_code=204)
-async def delete_note(note_id: int, current_user: dict = Depends(get_current_user)):
+async def delete_note(note_id: int, current_user: CurrentUser = Depends(get_current_user)):
     """
     Delete a note.
     
@@ -157,16 +111,21 @@ async def delete_note(note_id: int, current_user: dict = Depends(get_current_use
         note_id: Note ID to delete
         current_user: Authenticated user (from dependency)
     """
+    from postgrest.types import CountMethod, ReturnMethod
+    
+    supabase = require_client(get_supabase_admin)
     try:
-        # First verify the note belongs to the user
+        # Delete the note if it belongs to the user
         # Using admin client since we've already validated the user in middleware
-        response = supabase_admin.table("notes").select("id").eq("id", note_id).eq("user_id", current_user["id"]).execute()
-        
-        if not response.data:
+        # Ask PostgREST for the affected row count instead of the deleted rows;
+        # a zero count means no matching note
+        response = supabase.table("notes").delete(
+            count=CountMethod.exact,
+            returning=ReturnMethod.minimal
+        ).eq("id", note_id).eq("user_id", current_user.id).execute()
+        
+        if not response.count:
             raise HTTPException(status_code=404, detail="Note not found")
-        
-        # Delete the note
-        supabase_admin.table("notes").delete().eq("id", note_id).eq("user_id", current_user["id"]).execute()
     except HTTPException:
         raise
     except Exception as e:
@@ -174,7 +133,7 @@ async def delete_note(note_id: int, current_user: dict = Depends(get_current_use
 
 
 @router.post("/{note_id}/summarize", response_model=NoteResponse)
-async def summarize_note(note_id: int, current_user: dict = Depends(get_current_user)):
+async def summarize_note(note_id: int, current_user: CurrentUser = Depends(get_current_user)):
     """
     Generate or regenerate summary for a note.
     
@@ -185,43 +144,99 @@ async def summarize_note(note_id: int, current_user: dict = Depends(get_current_
     Returns:
         Updated note with summary
     """
+    supabase = require_client(get_supabase_admin)
     try:
         # Using admin client since we've already validated the user in middleware
-        # Get the note
-        response = supabase_admin.table("notes").select("*").eq("id", note_id).eq("user_id", current_user["id"]).execute()
+        # Get the note content (the full row comes back from the update below)
+        response = supabase.table("notes").select("content").eq("id", note_id).eq("user_id", current_user.id).execute()
         
         if not response.data:
             raise HTTPException(status_code=404, detail="Note not found")
         
         note = response.data[0]
         
+        if not note["content"].strip():
+            raise HTTPException(status_code=400, detail="Note has no content to summarize")
+        
         # Generate summary
-        summary = summarize_text(note["content"])
+        summary = await summarize_text(note["content"])
         
         if not summary:
             raise HTTPException(status_code=500, detail="Failed to generate summary. Check OpenAI API key.")
         
         # Update note with summary
-        update_response = supabase_admin.table("notes").update({
+        update_response = supabase.table("notes").update({
             "summary": summary,
             "updated_at": datetime.utcnow().isoformat()
-        }).eq("id", note_id).eq("user_id", current_user["id"]).execute()
+        }).eq("id", note_id).eq("user_id", current_user.id).select(NOTE_COLUMNS).execute()
         
         if not update_response.data:
             raise HTTPException(status_code=400, detail="Failed to update note")
         
-        updated_note = update_response.data[0]
-        # Convert data types
-        if 'id' in updated_note and updated_note['id'] is not None:
-            updated_note['id'] = int(updated_note['id'])
-        if 'created_at' in updated_note and isinstance(updated_note['created_at'], str):
-            updated_note['created_at'] = datetime.fromisoformat(updated_note['created_at'].replace('Z', '+00:00'))
-        if 'updated_at' in updated_note and isinstance(updated_note['updated_at'], str):
-            updated_note['updated_at'] = datetime.fromisoformat(updated_note['updated_at'].replace('Z', '+00:00'))
-        
-        return NoteResponse(**updated_note)
+        return NoteResponse.model_validate(update_response.data[0])
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to summarize note: {str(e)}")
 
+
+@router.post("/{note_id}/summarize/stream")
+async def stream_note_summary(note_id: int, current_user: CurrentUser = Depends(get_current_user)):
+    """
+    Generate or regenerate summary for a note, streaming it as Server-Sent Events.
+    Each event's data is a JSON-encoded piece of the summary; a final "done"
+    event follows once the summary has been saved to the note, or an "error"
+    event if no summary could be generated.
+    Note that Mangum (index.py) buffers the response, so on Vercel the
+    events arrive together once the summary is complete.
+    
+    Args:
+        note_id: Note ID to summarize
+        current_user: Authenticated user (from dependency)
+        
+    Returns:
+        Streaming response of summary events
+    """
+    supabase = require_client(get_supabase_admin)
+    try:
+        # Using admin client since we've already validated the user in middleware
+        response = supabase.table("notes").select("content").eq("id", note_id).eq("user_id", current_user.id).execute()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to summarize note: {str(e)}")
+    
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Note not found")
+    
+    content = response.data[0]["content"]
+    if not content.strip():
+        raise HTTPException(status_code=400, detail="Note has no content to summarize")
+    
+    async def events():
+        parts = []
+        try:
+            async for delta in stream_summary(content):
+                parts.append(delta)
+                yield f"data: {json.dumps(delta)}\n\n"
+        except Exception:
+            # Don't save a summary that was cut off part-way through
+            yield f"event: error\ndata: {json.dumps('Failed to generate summary. Please try again.')}\n\n"
+            return
+        
+        summary = "".join(parts).strip()
+        if not summary:
+            yield f"event: error\ndata: {json.dumps('Failed to generate summary. Check OpenAI API key.')}\n\n"
+            return
+        
+        try:
+            # Update note with summary
+            supabase.table("notes").update({
+                "summary": summary,
+                "updated_at": datetime.utcnow().isoformat()
+            }).eq("id", note_id).eq("user_id", current_user.id).execute()
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps(f'Failed to update note: {e}')}\n\n"
+            return
+        
+        yield "event: done\ndata: {}\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
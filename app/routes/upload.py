@@ -1,20 +1,22 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
 from fastapi.responses import JSONResponse
-from app.database import supabase, supabase_admin
-from app.middleware.auth import get_current_user
+from app.config import MAX_FILE_SIZE, get_settings
+from app.database import get_supabase_admin, require_client
+from app.middleware.auth import CurrentUser, get_current_user
+import os
 import uuid
 from typing import Optional
 
 router = APIRouter(prefix="/upload", tags=["upload"])
 
-ALLOWED_IMAGE_TYPES = ["image/jpeg", "image/jpg", "image/png", "image/gif", "image/webp"]
-MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+ALLOWED_IMAGE_TYPES: frozenset[str] = frozenset({"image/jpeg", "image/jpg", "image/png", "image/gif", "image/webp"})
+_ALLOWED_TYPES_STR = ", ".join(sorted(ALLOWED_IMAGE_TYPES))
 
 
 @router.post("/image")
 async def upload_image(
     file: UploadFile = File(...),
-    current_user: dict = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Upload an image file to Supabase Storage.
@@ -30,27 +32,29 @@ async def upload_image(
     if file.content_type not in ALLOWED_IMAGE_TYPES:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid file type. Allowed types: {', '.join(ALLOWED_IMAGE_TYPES)}"
+            detail=f"Invalid file type. Allowed types: {_ALLOWED_TYPES_STR}"
         )
     
-    # Read file content
-    file_content = await file.read()
+    # Read at most one byte past the limit: enough to detect an oversize
+    # file while holding a single copy of at most MAX_FILE_SIZE + 1 bytes
+    file_content = await file.read(MAX_FILE_SIZE + 1)
     
     # Validate file size
     if len(file_content) > MAX_FILE_SIZE:
         raise HTTPException(
-            status_code=400,
+            status_code=413,
             detail=f"File too large. Maximum size is {MAX_FILE_SIZE / (1024 * 1024)}MB"
         )
     
+    supabase = require_client(get_supabase_admin)
     try:
         # Generate unique filename
-        file_extension = file.filename.split(".")[-1] if "." in file.filename else "jpg"
-        unique_filename = f"{current_user['id']}/{uuid.uuid4()}.{file_extension}"
+        file_extension = os.path.splitext(file.filename or "")[1].lstrip(".").lower() or "jpg"
+        unique_filename = f"{current_user.id}/{uuid.uuid4().hex}.{file_extension}"
         
         # Upload to Supabase Storage
         # Using admin client to bypass RLS policies
-        storage = supabase_admin.storage.from_("note-images")
+        storage = supabase.storage.from_("note-images")
         
         # Upload file (Supabase Python client returns a StorageFileApiResponse object)
         upload_response = storage.upload(
@@ -84,13 +88,11 @@ async def upload_image(
             url = public_url_response
         else:
             # Fallback: construct URL manually
-            from app.config import settings
-            url = f"{settings.supabase_url}/storage/v1/object/public/note-images/{unique_filename}"
+            url = f"{get_settings().supabase_url}/storage/v1/object/public/note-images/{unique_filename}"
         
         # Ensure we have a valid URL
         if not url or url.startswith('{'):
-            from app.config import settings
-            url = f"{settings.supabase_url}/storage/v1/object/public/note-images/{unique_filename}"
+            url = f"{get_settings().supabase_url}/storage/v1/object/public/note-images/{unique_filename}"
         
         return JSONResponse(content={
             "url": url,
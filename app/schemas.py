@@ -1,6 +1,20 @@
-from pydantic import BaseModel, EmailStr, field_validator
-from typing import Optional, Union
+from pydantic import AfterValidator, BaseModel, ConfigDict, TypeAdapter
+from typing import Annotated, Optional, Union
 from datetime import datetime
+import re
+
+# Lightweight email shape check: something@domain.tld
+_EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+
+def _check_email(v: str) -> str:
+    """Return the email if it looks valid, otherwise raise ValueError"""
+    if not _EMAIL_RE.match(v):
+        raise ValueError("value is not a valid email address")
+    return v
+
+
+Email = Annotated[str, AfterValidator(_check_email)]
 
 
 class NoteCreate(BaseModel):
@@ -16,53 +30,45 @@ class NoteUpdate(BaseModel):
 
 
 class NoteResponse(BaseModel):
-    id: int  # BIGSERIAL from PostgreSQL will be converted to int
+    # Response models are never mutated after construction
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    id: int  # BIGSERIAL from PostgreSQL (int or numeric string) is coerced by pydantic-core
     title: str
     content: str
     image_url: Optional[str] = None
     summary: Optional[str] = None
     user_id: str
-    created_at: datetime
+    created_at: datetime  # ISO strings from Supabase (incl. 'Z') are parsed by pydantic-core
     updated_at: datetime
 
-    @field_validator('id', mode='before')
-    @classmethod
-    def convert_id(cls, v):
-        """Convert id to int if it's a string or bigint"""
-        if v is None:
-            return v
-        return int(v)
-
-    @field_validator('created_at', 'updated_at', mode='before')
-    @classmethod
-    def parse_datetime(cls, v):
-        """Parse datetime from string if needed"""
-        if isinstance(v, str):
-            # Handle ISO format strings from Supabase
-            v = v.replace('Z', '+00:00')
-            try:
-                return datetime.fromisoformat(v)
-            except ValueError:
-                # Try alternative parsing
-                return datetime.fromisoformat(v.replace('+00:00', ''))
-        return v
-
-    class Config:
-        from_attributes = True
+
+# Built once so list endpoints validate a whole page of notes in one call
+NOTE_LIST_ADAPTER = TypeAdapter(list[NoteResponse])
 
 
 class UserRegister(BaseModel):
-    email: EmailStr
+    email: Email
     password: str
 
 
 class UserLogin(BaseModel):
-    email: EmailStr
+    email: Email
     password: str
 
 
+class UserInfo(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    id: str
+    email: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+
 class TokenResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     access_token: str
     token_type: str
-    user: dict
+    user: UserInfo
 
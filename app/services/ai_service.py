@@ -1,9 +1,115 @@
-from app.config import settings
-from typing import Optional
-import openai
+from app.config import get_settings
+from cachetools import LRUCache
+from functools import lru_cache
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Dict, Iterable, List, Optional, Tuple, TypeVar
+import asyncio
+import hashlib
+import json
 
+if TYPE_CHECKING:
+    import openai
+    import tiktoken
 
-def summarize_text(text: str, max_length: int = 100) -> Optional[str]:
+T = TypeVar("T")
+
+SUMMARY_MODEL = "gpt-3.5-turbo"
+
+# Input budget per summarization request; longer notes are truncated
+MAX_INPUT_TOKENS = 3000
+# Fallback budget when the tokenizer is unavailable (~4 characters per token)
+MAX_INPUT_CHARS = MAX_INPUT_TOKENS * 4
+
+# Terminal states of an OpenAI batch job
+BATCH_FINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+# Generated summaries keyed by (blake2b(text), max_length)
+# Re-saving a note without changing its content reuses the earlier summary
+_summary_cache = LRUCache(maxsize=1024)
+
+
+@lru_cache(maxsize=1)
+def _get_client(api_key: str) -> "openai.AsyncOpenAI":
+    """Return an OpenAI client for the key, reusing its connection pool across calls."""
+    # Imported here so the openai package stays off the cold-start import path
+    import openai
+    return openai.AsyncOpenAI(api_key=api_key)
+
+
+@lru_cache(maxsize=1)
+def _get_encoding() -> "tiktoken.Encoding":
+    """Return the tokenizer for the summary model."""
+    # Imported here so tiktoken stays off the cold-start import path
+    import tiktoken
+    return tiktoken.encoding_for_model(SUMMARY_MODEL)
+
+
+async def _truncate_to_budget(text: str) -> str:
+    """
+    Truncate text to at most MAX_INPUT_TOKENS tokens.
+    Falls back to a character cut if the tokenizer can't be loaded.
+    
+    Args:
+        text: The text to truncate
+        
+    Returns:
+        The text, cut down to the token budget if it was longer
+    """
+    # Every token covers at least one UTF-8 byte, so short texts can't exceed the budget
+    if len(text.encode()) <= MAX_INPUT_TOKENS:
+        return text
+    try:
+        # The first load may download the BPE file, so keep it off the event loop
+        encoding = await asyncio.to_thread(_get_encoding)
+    except Exception as e:
+        print(f"Error loading tokenizer, truncating by characters: {e}")
+        return text[:MAX_INPUT_CHARS]
+    tokens = encoding.encode(text)
+    if len(tokens) <= MAX_INPUT_TOKENS:
+        return text
+    return encoding.decode(tokens[:MAX_INPUT_TOKENS])
+
+
+def _completion_params(text: str, max_length: int) -> dict:
+    """Build the chat completion parameters used to summarize text."""
+    return {
+        "model": SUMMARY_MODEL,
+        "messages": [
+            {"role": "system", "content": f"Summarize the following text in {max_length} words or less:"},
+            {"role": "user", "content": text}
+        ],
+        # max_length is in words; allow ~2 tokens per word, capped for short replies
+        "max_tokens": min(max_length * 2, 200),
+        # A summary is a single paragraph; stop instead of running on to the cap
+        "stop": ["\n\n"],
+        "temperature": 0.7
+    }
+
+
+async def _prepare_summary(text: str, max_length: int) -> Tuple[Optional[str], str, Optional[tuple]]:
+    """
+    Shared setup for summarize_text and stream_summary.
+    
+    Args:
+        text: The text to summarize
+        max_length: Maximum length of the summary
+        
+    Returns:
+        Tuple of (summary if no API call is needed, prompt text, cache key)
+    """
+    # Text that already fits the summary length is its own summary,
+    # stripped to match what the model path returns
+    if len(text.split()) <= max_length:
+        stripped = text.strip()
+        return stripped, stripped, None
+    
+    # Bound prompt size (and so latency and cost) on long notes
+    text = await _truncate_to_budget(text)
+    
+    key = (hashlib.blake2b(text.encode(), digest_size=16).digest(), max_length)
+    return _summary_cache.get(key), text, key
+
+
+async def summarize_text(text: str, max_length: int = 100) -> Optional[str]:
     """
     Summarize text using OpenAI API.
     
@@ -12,26 +118,229 @@ def summarize_text(text: str, max_length: int = 100) -> Optional[str]:
         max_length: Maximum length of the summary
         
     Returns:
-        Summary string or None if API key is not set
+        Summary string, or None if the text is empty, API key is not set or the call fails
     """
+    if not text.strip():
+        return None
+    
+    settings = get_settings()
     if not settings.openai_api_key:
         return None
     
     try:
-        client = openai.OpenAI(api_key=settings.openai_api_key)
-        
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": f"Summarize the following text in {max_length} words or less:"},
-                {"role": "user", "content": text}
-            ],
-            max_tokens=max_length,
-            temperature=0.7
-        )
-        
-        return response.choices[0].message.content.strip()
+        summary, text, key = await _prepare_summary(text, max_length)
+        if summary is not None:
+            return summary
+        
+        client = _get_client(settings.openai_api_key)
+        
+        response = await client.chat.completions.create(**_completion_params(text, max_length))
+        
+        summary = response.choices[0].message.content.strip()
+        _summary_cache[key] = summary
+        return summary
     except Exception as e:
         print(f"Error summarizing text: {e}")
         return None
 
+
+async def stream_summary(text: str, max_length: int = 100) -> AsyncIterator[str]:
+    """
+    Summarize text using OpenAI API, yielding the summary as it is generated.
+    Same behavior as summarize_text, but the first words arrive after the
+    model's first-token latency instead of after the full completion.
+    
+    Args:
+        text: The text to summarize
+        max_length: Maximum length of the summary
+        
+    Yields:
+        Pieces of the summary (nothing if the text is empty or API key is not set)
+        
+    Raises:
+        Exception: If the OpenAI call fails, including part-way through the
+            stream, so callers don't mistake a partial summary for a complete one
+    """
+    if not text.strip():
+        return
+    
+    settings = get_settings()
+    if not settings.openai_api_key:
+        return
+    
+    parts = []
+    try:
+        summary, text, key = await _prepare_summary(text, max_length)
+        if summary is not None:
+            yield summary
+            return
+        
+        client = _get_client(settings.openai_api_key)
+        
+        stream = await client.chat.completions.create(**_completion_params(text, max_length), stream=True)
+        
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                yield delta
+    except Exception as e:
+        print(f"Error summarizing text: {e}")
+        raise
+    
+    summary = "".join(parts).strip()
+    if summary:
+        _summary_cache[key] = summary
+
+
+async def _sem_wrap(sem: asyncio.Semaphore, coro: Awaitable[T]) -> T:
+    """Await a coroutine while holding a semaphore slot."""
+    async with sem:
+        return await coro
+
+
+async def summarize_many(texts: List[str], max_length: int = 100, concurrency: int = 8) -> List[Optional[str]]:
+    """
+    Summarize several texts concurrently.
+    
+    Args:
+        texts: The texts to summarize
+        max_length: Maximum length of each summary
+        concurrency: Maximum number of OpenAI requests in flight at once
+        
+    Returns:
+        Summaries in the same order as texts (None where summarization failed)
+    """
+    sem = asyncio.Semaphore(concurrency)
+    tasks = [_sem_wrap(sem, summarize_text(t, max_length)) for t in texts]
+    return await asyncio.gather(*tasks)
+
+
+async def submit_batch(texts: Dict[str, str], max_length: int = 100) -> Tuple[Optional[str], Dict[str, Optional[str]]]:
+    """
+    Submit texts to the OpenAI Batch API for non-interactive summarization.
+    Batch requests cost half as much and don't count against RPM limits,
+    at the price of completing within 24 hours instead of immediately.
+    Texts that summarize_text would answer without an API call (empty,
+    already short enough, or cached) are resolved locally and not submitted.
+    
+    Args:
+        texts: Texts to summarize keyed by an id (e.g. note id)
+        max_length: Maximum length of each summary
+        
+    Returns:
+        Tuple of (batch ID or None if nothing had to be submitted,
+        summaries resolved locally keyed by id)
+    """
+    settings = get_settings()
+    if not settings.openai_api_key:
+        return None, {}
+    
+    resolved: Dict[str, Optional[str]] = {}
+    lines = []
+    for custom_id, text in texts.items():
+        custom_id = str(custom_id)
+        if not text.strip():
+            resolved[custom_id] = None
+            continue
+        
+        summary, text, _ = await _prepare_summary(text, max_length)
+        if summary is not None:
+            resolved[custom_id] = summary
+            continue
+        
+        lines.append(json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": _completion_params(text, max_length)
+        }))
+    
+    if not lines:
+        return None, resolved
+    
+    client = _get_client(settings.openai_api_key)
+    
+    input_file = await client.files.create(
+        file=("summaries.jsonl", "\n".join(lines).encode()),
+        purpose="batch"
+    )
+    batch = await client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    return batch.id, resolved
+
+
+async def _read_batch_file(client: "openai.AsyncOpenAI", file_id: str) -> List[dict]:
+    """Download a batch output or error file and parse its JSONL lines."""
+    content = await client.files.content(file_id)
+    return [json.loads(line) for line in content.text.splitlines() if line]
+
+
+async def wait_for_batch(
+    batch_id: str,
+    custom_ids: Optional[Iterable[str]] = None,
+    poll_interval: float = 30.0
+) -> Dict[str, Optional[str]]:
+    """
+    Wait for a summarization batch to finish and collect its results.
+    
+    Args:
+        batch_id: ID returned by submit_batch
+        custom_ids: Ids submitted in the batch; each one missing from the
+            output is reported as None
+        poll_interval: Seconds between status checks
+        
+    Returns:
+        Summaries keyed by the ids passed to submit_batch (None where a request failed)
+        
+    Raises:
+        RuntimeError: If the batch failed, expired or was cancelled
+    """
+    client = _get_client(get_settings().openai_api_key)
+    
+    batch = await client.batches.retrieve(batch_id)
+    while batch.status not in BATCH_FINAL_STATUSES:
+        await asyncio.sleep(poll_interval)
+        batch = await client.batches.retrieve(batch_id)
+    
+    if batch.status != "completed":
+        raise RuntimeError(f"Batch {batch_id} ended with status '{batch.status}'")
+    
+    results: Dict[str, Optional[str]] = {str(custom_id): None for custom_id in custom_ids or ()}
+    
+    # Failed requests are written to the error file, not the output file
+    if batch.error_file_id:
+        for result in await _read_batch_file(client, batch.error_file_id):
+            results[result["custom_id"]] = None
+    
+    if batch.output_file_id:
+        for result in await _read_batch_file(client, batch.output_file_id):
+            response = result.get("response") or {}
+            content = None
+            if response.get("status_code") == 200:
+                content = response["body"]["choices"][0]["message"].get("content")
+            results[result["custom_id"]] = content.strip() if content else None
+    return results
+
+
+async def summarize_batch(texts: Dict[str, str], max_length: int = 100, poll_interval: float = 30.0) -> Dict[str, Optional[str]]:
+    """
+    Summarize texts through the OpenAI Batch API and wait for the results.
+    Intended for bulk jobs such as backfilling summaries, not request handlers.
+    
+    Args:
+        texts: Texts to summarize keyed by an id (e.g. note id)
+        max_length: Maximum length of each summary
+        poll_interval: Seconds between status checks
+        
+    Returns:
+        Summaries keyed by id (empty if API key is not set)
+    """
+    batch_id, results = await submit_batch(texts, max_length)
+    if batch_id is not None:
+        submitted = [str(custom_id) for custom_id in texts if str(custom_id) not in results]
+        results.update(await wait_for_batch(batch_id, submitted, poll_interval))
+    return results
@@ -24,10 +24,63 @@ os.environ.setdefault("ENVIRONMENT", "production")
 
 # Try to import and create handler
 # Print debug info to stderr (visible in Vercel logs)
+# Progress messages are only printed when DEBUG_INIT=1; errors always are
 import sys as sys_module
+_DEBUG = os.environ.get("DEBUG_INIT") == "1"
+
 def debug_print(*args, **kwargs):
+    if _DEBUG:
+        print(*args, **kwargs, file=sys_module.stderr)
+
+def error_print(*args, **kwargs):
     print(*args, **kwargs, file=sys_module.stderr)
-    sys_module.stderr.flush()
+
+def _format_init_error(e):
+    """
+    Describe an initialization failure once, while its traceback is available.
+    
+    Returns:
+        Tuple of (log message, JSON response body)
+    """
+    tb = traceback.format_exc()
+    
+    if isinstance(e, ImportError):
+        error_msg = f"Import error: {str(e)}\n\n"
+        error_msg += f"Python path: {sys.path}\n"
+        error_msg += f"Current dir: {current_dir}\n"
+        error_msg += f"Parent dir: {parent_dir}\n"
+        error_msg += f"Files in parent: {os.listdir(parent_dir) if os.path.exists(parent_dir) else 'NOT FOUND'}\n"
+    else:
+        error_msg = f"Error initializing app: {str(e)}\n\n"
+        error_msg += f"Error type: {type(e).__name__}\n"
+    error_msg += f"Traceback: {tb}\n\n"
+    error_msg += "Make sure:\n"
+    error_msg += "1. All environment variables are set in Vercel (SUPABASE_URL, SUPABASE_KEY, SUPABASE_SERVICE_KEY, SUPABASE_JWT_SECRET)\n"
+    error_msg += "2. The 'app' folder exists in the root directory\n"
+    error_msg += "3. All dependencies are in api/requirements.txt\n"
+    error_msg += "4. You've redeployed after adding environment variables"
+    
+    import json
+    error_body = json.dumps({
+        "error": "Initialization failed",
+        "message": str(e),
+        "error_type": type(e).__name__,
+        "traceback": tb,
+        "help": "Check Vercel logs for full details. Common issues: missing env vars, wrong file structure, or missing dependencies."
+    }, separators=(",", ":"))
+    
+    return error_msg, error_body
+
+def _error_response(body):
+    """Build the 500 response returned by every request when initialization failed."""
+    return {
+        "statusCode": 500,
+        "headers": {
+            "Content-Type": "application/json",
+            "Access-Control-Allow-Origin": "*"
+        },
+        "body": body
+    }
 
 debug_print("=== Starting Vercel function initialization ===")
 debug_print(f"Current dir: {current_dir}")
@@ -46,54 +99,28 @@ try:
     debug_print("Creating Mangum handler...")
     handler = Mangum(app, lifespan="off")
     debug_print("✓ Handler created successfully")
-    debug_print("=== Initialization complete ===")
-    
-except ImportError as e:
-    # Handle import errors with detailed message
-    error_msg = f"Import error: {str(e)}\n\n"
-    error_msg += f"Python path: {sys.path}\n"
-    error_msg += f"Current dir: {current_dir}\n"
-    error_msg += f"Parent dir: {parent_dir}\n"
-    error_msg += f"Files in parent: {os.listdir(parent_dir) if os.path.exists(parent_dir) else 'NOT FOUND'}\n"
-    error_msg += f"Traceback: {traceback.format_exc()}"
     
-    debug_print(f"❌ Import error: {error_msg}")
-    
-    def handler(event, context):
-        return {
-            "statusCode": 500,
-            "headers": {"Content-Type": "application/json"},
-            "body": error_msg
-        }
+    # Pre-warm settings and Supabase clients while still in the init phase,
+    # which gets extra CPU, instead of on the first request. The app creates
+    # these lazily, so a failure here (e.g. missing env vars) is only logged
+    # and left for the first request that needs them to report
+    debug_print("Pre-warming settings and Supabase clients...")
+    try:
+        from app.database import get_supabase, get_supabase_admin
+        get_supabase()
+        get_supabase_admin()
+        debug_print("✓ Pre-warm complete")
+    except Exception as e:
+        error_print(f"⚠ Pre-warm skipped: {e}")
+    debug_print("=== Initialization complete ===")
     
 except Exception as e:
-    # Handle other errors (including config errors)
-    error_msg = f"Error initializing app: {str(e)}\n\n"
-    error_msg += f"Error type: {type(e).__name__}\n"
-    error_msg += f"Traceback: {traceback.format_exc()}\n\n"
-    error_msg += "Make sure:\n"
-    error_msg += "1. All environment variables are set in Vercel (SUPABASE_URL, SUPABASE_KEY, SUPABASE_SERVICE_KEY)\n"
-    error_msg += "2. The 'app' folder exists in the root directory\n"
-    error_msg += "3. All dependencies are in api/requirements.txt\n"
-    error_msg += "4. You've redeployed after adding environment variables"
+    # Handle import errors and other errors (including config errors) alike
+    error_msg, error_body = _format_init_error(e)
     
-    debug_print(f"❌ Initialization error: {error_msg}")
+    error_print(f"❌ Initialization error: {error_msg}")
     
     # Create a handler that returns the error in the response
     # This way you can see the error by visiting /api/health or any endpoint
     def handler(event, context):
-        import json
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*"
-            },
-            "body": json.dumps({
-                "error": "Initialization failed",
-                "message": str(e),
-                "error_type": type(e).__name__,
-                "traceback": traceback.format_exc(),
-                "help": "Check Vercel logs for full details. Common issues: missing env vars, wrong file structure, or missing dependencies."
-            }, indent=2)
-        }
+        return _error_response(error_body)